@@ -5,6 +5,38 @@ import sqlite3  # For storing data in a lightweight SQLite database
 from datetime import datetime, timedelta  # For working with dates and time intervals
 import pandas_datareader.data as web  # For fetching stock market data from online sources
 import time  # For adding delays in retry logic during data fetching
+import requests  # For the HTTP session (with timeouts) used by pandas_datareader
+from typing import Optional  # For annotating fetchers that may return no data
+import os  # For managing the on-disk market data cache
+from functools import wraps  # For preserving function metadata in decorators
+from contextlib import closing  # For closing database connections when a block exits
+from concurrent.futures import ThreadPoolExecutor  # For downloading several symbols in parallel
+import pyarrow as pa  # For converting results to Arrow tables
+import pyarrow.csv as pacsv  # For Arrow's native CSV writer
+from joblib import Parallel, delayed  # For analyzing events in parallel worker processes
+from numba import njit  # For compiling tight numeric loops (e.g., RSI smoothing, event metrics)
+
+# Database used to store the results: "sqlite" (tariff_analysis.db) or "duckdb" (tariff_analysis.duckdb)
+DB_BACKEND = "sqlite"
+SQLITE_CHUNK_ROWS = 10_000  # Rows per executemany call when writing to SQLite
+
+# Minimum number of events before analysis is spread over worker processes (each event takes about 1 ms)
+PARALLEL_MIN_EVENTS = 2_000
+
+# Network limits for market data downloads
+FETCH_TIMEOUT = 5  # Seconds before a single HTTP request is abandoned
+FETCH_ATTEMPTS = 2  # Tries against Stooq before falling back to Yahoo Finance
+FETCH_RETRY_PAUSE = 1  # Seconds to wait between Stooq attempts
+
+# Reference time for the run and the fixed windows used around each event, computed once
+NOW = datetime.now()
+LOOKBACK = timedelta(days=30)  # History before the announcement, used to seed RSI
+ONE_YEAR = timedelta(days=365)  # Longest analysis horizon after the announcement
+TOO_RECENT_CUTOFF = NOW - timedelta(days=30)  # Events after this have too little data to analyze
+
+# Location and freshness of the on-disk Parquet cache for downloaded market data
+CACHE_DIR = "cache"
+CACHE_TTL = timedelta(days=1)  # Only applies to windows that end today or later
 
 # Define a list of tariff events with detailed descriptions
 # Each event includes the year, a descriptive event name, the announcement date, and affected countries
@@ -41,200 +73,420 @@ events = [
     }  # Hypothetical future tariffs based on proposed policies, targeting major trading partners
 ]
 
-# Add key date points for each event to analyze market reactions over time
-for event in events:
-    # Convert the announcement date string to a datetime object for calculations
-    date = datetime.strptime(event["date"], "%Y-%m-%d")
+# Analysis periods and the metrics calculated for each; together they name the result columns
+PERIODS = ['one_week_after', 'one_month_after', 'three_months_after',
+           'six_months_after', 'end_of_year']
+METRICS = ['price_change_%', 'volume_change_%', 'rsi']
+# Metric column names in period-major order, matching the flattened output of _event_kernel
+METRIC_COLUMNS = [f"{period}_{metric}" for period in PERIODS for metric in METRICS]
+
+# Day offsets of the fixed-length analysis periods: 1 week, 1 month, 3 months and 6 months post-announcement
+PERIOD_OFFSETS = np.array([7, 30, 90, 180], dtype='timedelta64[D]')
+
+# Define a function to add key date points to all events at once, to analyze market reactions over time
+def _add_event_dates(events):
+    """
+    Parse the announcement dates and compute every analysis period date for all events in one pass.
+    Parsed dates are stored under underscore keys so the analysis never re-parses event["date"].
+    Parameters: events (list of event dicts).
+    Returns: new list of event dicts with "_dt", "announcement_date" and "_period_dts" added.
+    """
+    edf = pd.DataFrame(events)
+    # Parse every announcement date in one call, as datetimes for window arithmetic
+    edf["_dt"] = pd.to_datetime(edf["date"], format="%Y-%m-%d")
     # Store the original announcement date
-    event["announcement_date"] = event["date"]
-    # Calculate and store dates for analysis periods relative to the announcement
-    event["one_week_after"] = (date + timedelta(days=7)).strftime("%Y-%m-%d")  # 1 week post-announcement
-    event["one_month_after"] = (date + timedelta(days=30)).strftime("%Y-%m-%d")  # 1 month post-announcement
-    event["three_months_after"] = (date + timedelta(days=90)).strftime("%Y-%m-%d")  # 3 months post-announcement
-    event["six_months_after"] = (date + timedelta(days=180)).strftime("%Y-%m-%d")  # 6 months post-announcement
-    event["end_of_year"] = f"{event['year']}-12-31"  # End of the announcement year (YTD)
+    edf["announcement_date"] = edf["date"]
+    # End of each announcement year (YTD)
+    year_ends = pd.to_datetime(edf["year"].astype(str) + "-12-31", format="%Y-%m-%d")
+    # One row of analysis period dates per event, in the same order as PERIODS
+    announcements = edf["_dt"].to_numpy(dtype='datetime64[ns]')
+    period_dts = np.column_stack([announcements[:, None] + PERIOD_OFFSETS,
+                                  year_ends.to_numpy(dtype='datetime64[ns]')])
+    edf["_period_dts"] = list(period_dts)
+    return edf.to_dict("records")
+
+events = _add_event_dates(events)
+
+# Define the Wilder smoothing loop used by RSI, compiled to machine code with Numba
+@njit(cache=True, error_model='numpy')  # Division by zero gives inf/NaN like NumPy instead of raising
+def _wilder_smooth(values, periods):
+    """
+    Apply Wilder's running moving average (RMA) to per-bar changes, where values[0] has no prior bar.
+    The average is seeded at index `periods` with the simple mean of values[1:periods+1], then each
+    step blends the previous average with the new value: avg = avg*(n-1)/n + x/n.
+    NaN inputs (e.g., a missing close) are skipped by carrying the previous average forward.
+    """
+    out = np.full(values.shape[0], np.nan)  # Leading values stay NaN until the seed
+    if values.shape[0] <= periods:
+        return out
+
+    total = 0.0
+    count = 0
+    for i in range(1, periods + 1):
+        if not np.isnan(values[i]):
+            total += values[i]
+            count += 1
+    avg = total / count if count > 0 else np.nan
+    out[periods] = avg
+
+    for i in range(periods + 1, values.shape[0]):
+        if not np.isnan(values[i]):
+            if np.isnan(avg):
+                avg = values[i]  # No valid history yet: start from the first valid change
+            else:
+                avg = avg * (periods - 1) / periods + values[i] / periods
+        out[i] = avg
+    return out
 
 # Define a function to calculate the Relative Strength Index (RSI), a momentum indicator
-def calculate_rsi(data, periods=14):
+def calculate_rsi(close_arr: np.ndarray, periods=14):
     """
-    Calculate RSI to measure the speed and change of price movements.
+    Calculate Wilder's RSI to measure the speed and change of price movements.
     RSI ranges from 0 to 100; above 70 indicates overbought, below 30 indicates oversold.
+    Parameters: close_arr (NumPy array of closing prices), periods (smoothing window).
+    Returns: NumPy array of RSI values aligned with close_arr; the first `periods` values are NaN.
     """
-    delta = data.diff()  # Calculate daily price changes
-    gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()  # Average gains over 14 days
-    loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()  # Average losses over 14 days
-    rs = gain / loss  # Relative strength (gain/loss ratio)
-    return 100 - (100 / (1 + rs))  # Convert to RSI formula
+    close_arr = np.asarray(close_arr, dtype=np.float64)
+    if close_arr.shape[0] <= periods:
+        return np.full(close_arr.shape[0], np.nan)  # Not enough history to seed the averages
 
-# Define a function to fetch market data from online sources with retry logic
-def fetch_market_data(symbol, start, end, attempts=3):
+    delta = np.diff(close_arr, prepend=close_arr[0])  # Calculate daily price changes (delta[0] is a placeholder)
+    gain = np.maximum(delta, 0.0)  # Upward moves only
+    loss = np.maximum(np.negative(delta, out=delta), 0.0, out=delta)  # Downward moves only, reusing delta's buffer
+    # Seed each average with the mean of the first `periods` real changes, then smooth Wilder-style
+    avg_gain = _wilder_smooth(gain, periods)
+    avg_loss = _wilder_smooth(loss, periods)
+    with np.errstate(divide='ignore', invalid='ignore'):  # No losses gives RSI = 100; a flat window gives NaN
+        return 100 - (100 / (1 + avg_gain / avg_loss))  # Convert to RSI formula
+
+# Define the per-event metrics kernel, compiled with Numba so all periods are computed in one pass
+@njit(cache=True, error_model='numpy')  # Division by zero gives inf/NaN like NumPy instead of raising
+def _event_kernel(close, volume, rsi, i0, idxs):
     """
-    Fetch historical stock data (e.g., SPY) from Stooq or Yahoo Finance with retries on failure.
-    Parameters: symbol (e.g., 'SPY'), start date, end date, number of retry attempts.
+    Calculate price change %, volume change % and RSI at each period row relative to row i0.
+    Rows at or beyond the end of the data (e.g., future dates) are left as NaN.
+    Returns: array of shape (len(idxs), 3) ordered like METRICS.
+    """
+    out = np.full((idxs.shape[0], 3), np.nan)
+    for k in range(idxs.shape[0]):
+        i = idxs[k]
+        if i < close.shape[0]:
+            out[k, 0] = ((close[i] - close[i0]) / close[i0]) * 100  # % change in price
+            out[k, 1] = ((volume[i] - volume[i0]) / volume[i0]) * 100  # % change in trading volume
+            out[k, 2] = rsi[i]  # RSI value at that date
+    return out
+
+# Compile the Numba kernels once at import so the first event doesn't pay the compile latency
+# Price/volume inputs are read-only in practice (see to_market_arrays), which Numba compiles separately
+_warmup_close = np.linspace(1.0, 2.0, 20)
+_warmup_close.flags.writeable = False
+_event_kernel(_warmup_close, _warmup_close, calculate_rsi(_warmup_close), 0, np.array([1, 25], dtype=np.intp))
+
+# Define a decorator that caches fetched market data on disk as Parquet files
+def parquet_cache(fetch_func):
+    """
+    Cache a fetcher's results in CACHE_DIR, keyed by (symbol, start, end).
+    Historical bars never change, so repeated runs load from disk instead of re-downloading.
+    Windows ending today or later may still gain bars, so they share one "open" file per
+    (symbol, start) that is overwritten once it is older than CACHE_TTL.
+    """
+    @wraps(fetch_func)
+    def wrapper(symbol, start, end, *args, **kwargs):
+        # Normalize dates to strings so the cache key is stable across callers
+        if isinstance(start, datetime):
+            start = start.strftime('%Y-%m-%d')
+        if isinstance(end, datetime):
+            end = end.strftime('%Y-%m-%d')
+        # Key open windows without their end date so a new file isn't written every day
+        still_open = end >= datetime.now().strftime('%Y-%m-%d')  # Window may still be receiving data
+        cache_key = f"{symbol}_{start}_open" if still_open else f"{symbol}_{start}_{end}"
+        cache_path = os.path.join(CACHE_DIR, f"{cache_key}.parquet")
+
+        if os.path.exists(cache_path):
+            age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_path))
+            if not still_open or age < CACHE_TTL:
+                print(f"Loading cached {symbol} data from {cache_path}")
+                return pd.read_parquet(cache_path, engine="pyarrow")
+
+        df = fetch_func(symbol, start, end, *args, **kwargs)
+        if not df.empty:  # Never cache failed downloads
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_parquet(cache_path, engine="pyarrow")
+        return df
+    return wrapper
+
+# Define a requests session that applies a short timeout to every HTTP call
+class _TimeoutSession(requests.Session):
+    """Session passed to pandas_datareader so a stalled data source fails fast instead of hanging."""
+    def request(self, *args, **kwargs):
+        # pandas_datareader always passes its own 30 s timeout, so cap it rather than only defaulting it
+        kwargs["timeout"] = min(kwargs.get("timeout") or FETCH_TIMEOUT, FETCH_TIMEOUT)
+        return super().request(*args, **kwargs)
+
+# Define a function to try fetching data from Stooq, the primary source
+def _try_stooq(symbol, start, end, session, attempts) -> Optional[pd.DataFrame]:
+    """
+    Fetch data from Stooq, retrying after a short fixed pause on errors.
+    pandas_datareader's own retries are disabled, so `attempts` is the total number of HTTP requests.
+    Returns: DataFrame (possibly empty if Stooq has no data), or None if every attempt failed.
     """
     for attempt in range(attempts):
         try:
-            # Ensure dates are in string format for the data source
-            if isinstance(start, datetime):
-                start = start.strftime('%Y-%m-%d')
-            if isinstance(end, datetime):
-                end = end.strftime('%Y-%m-%d')
-                
-            print(f"Fetching {symbol} data from {start} to {end}...")
-            # Try Stooq first (good for historical data)
-            df = web.DataReader(symbol, 'stooq', start, end)
-            
-            if not df.empty:
-                df = df.sort_index()  # Sort data by date
-                print(f"Successfully fetched {len(df)} days of data for {symbol}")
-                return df
-            
-            # Fallback to Yahoo Finance if Stooq fails
-            df = web.DataReader(symbol, 'yahoo', start, end)
-            if not df.empty:
-                df = df.sort_index()
-                print(f"Successfully fetched {len(df)} days of data for {symbol}")
-                return df
-                
-            print(f"Warning: No data returned for {symbol} between {start} and {end}")
-            return pd.DataFrame()  # Return empty DataFrame if no data found
-            
+            return web.DataReader(symbol, 'stooq', start, end, retry_count=0, session=session)
         except Exception as e:
-            print(f"Attempt {attempt+1}/{attempts} - Error fetching data for {symbol}: {e}")
+            print(f"Attempt {attempt+1}/{attempts} - Error fetching {symbol} from Stooq: {e}")
             if attempt < attempts - 1:
-                wait_time = 2 ** attempt  # Exponential backoff (e.g., 1s, 2s, 4s)
-                print(f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
-            else:
-                print(f"Failed to fetch data for {symbol} after {attempts} attempts")
-                return pd.DataFrame()
+                time.sleep(FETCH_RETRY_PAUSE)
+    return None
+
+# Define a function to try fetching data from Yahoo Finance, the fallback source
+def _try_yahoo(symbol, start, end, session) -> Optional[pd.DataFrame]:
+    """
+    Fetch data from Yahoo Finance with a single attempt.
+    Returns: DataFrame, or None if the request failed.
+    """
+    try:
+        return web.DataReader(symbol, 'yahoo', start, end, retry_count=0, session=session)
+    except Exception as e:
+        print(f"Error fetching {symbol} from Yahoo Finance: {e}")
+        return None
+
+# Define a function to fetch market data from online sources with retry logic
+@parquet_cache
+def fetch_market_data(symbol, start, end, attempts=FETCH_ATTEMPTS):
+    """
+    Fetch historical stock data (e.g., SPY) from Stooq, falling back to Yahoo Finance only if Stooq fails.
+    An empty Stooq result is a valid answer (no data in the range) and is returned as is.
+    Parameters: symbol (e.g., 'SPY'), start and end dates ('YYYY-MM-DD' strings, normalized by parquet_cache),
+    number of Stooq attempts.
+    """
+    print(f"Fetching {symbol} data from {start} to {end}...")
+    with _TimeoutSession() as session:
+        # Try Stooq first (good for historical data)
+        df = _try_stooq(symbol, start, end, session, attempts)
+        if df is None:
+            # Fallback to Yahoo Finance only if Stooq errored out
+            df = _try_yahoo(symbol, start, end, session)
+
+    if df is None:
+        print(f"Failed to fetch data for {symbol}")
+        return pd.DataFrame()
+    if df.empty:
+        print(f"Warning: No data returned for {symbol} between {start} and {end}")
+        return pd.DataFrame()  # Return empty DataFrame if no data found
+
+    df = df.sort_index()  # Sort data by date
+    print(f"Successfully fetched {len(df)} days of data for {symbol}")
+    return df
+
+# Define a function to download several symbols at the same time
+def fetch_many(symbols, start, end, max_workers=8):
+    """
+    Fetch market data for multiple symbols concurrently using a thread pool.
+    Downloads are network-bound, so running them in parallel overlaps their latency.
+    Parameters: symbols (list of tickers), start date, end date, max_workers (thread pool size).
+    Returns: dict mapping each symbol to its DataFrame (empty if the fetch failed).
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {symbol: executor.submit(fetch_market_data, symbol, start, end) for symbol in symbols}
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+# Define a function to fetch data covering every event in a single request per symbol
+def fetch_all(symbols, events):
+    """
+    Fetch market data once per symbol for the combined date window of all events.
+    The window runs from the earliest 30-day lookback to the latest 1-year horizon (capped at today).
+    Parameters: symbols (list of tickers, e.g., ['SPY']), events (list of event dicts).
+    Returns: dict mapping each symbol to a date-sorted DataFrame with lowercase column names.
+    """
+    start_dates = [event["_dt"] for event in events]
+    global_start = min(start_dates) - LOOKBACK  # Earliest RSI lookback
+    global_end = min(max(start_dates) + ONE_YEAR, NOW)  # Latest analysis horizon
+
+    market_data = fetch_many(symbols, global_start, global_end)
+    # Standardize column names to lowercase once, so per-event analysis can use them directly
+    for df in market_data.values():
+        if not df.empty:
+            df.columns = df.columns.str.lower()
+    return market_data
+
+# Define a function to pull the columns used by the analysis out of a DataFrame, once per symbol
+def to_market_arrays(df):
+    """
+    Extract dates, closing prices and volumes as NumPy arrays so events can slice them by position.
+    The arrays are made read-only: pandas may return read-only views (copy-on-write) or fresh copies
+    depending on the column, and _event_kernel is compiled at import for read-only inputs.
+    Parameters: df (date-sorted DataFrame from fetch_all, possibly empty).
+    Returns: tuple (dates, close, volume) of equal-length arrays.
+    """
+    if df.empty:
+        return (np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64),
+                np.array([], dtype=np.float64))
+    arrays = (df.index.to_numpy(dtype='datetime64[ns]'),
+              df['close'].to_numpy(dtype=np.float64),
+              df['volume'].to_numpy(dtype=np.float64))
+    for arr in arrays:
+        arr.flags.writeable = False
+    return arrays
+
+# Define a function to assemble the result table as one NumPy array per column
+def build_results(events, metrics):
+    """
+    Combine event details with their calculated metrics, column by column.
+    Parameters: events (list of event dicts), metrics (2-D array, one row per event ordered like METRIC_COLUMNS).
+    Returns: dict mapping column name to a NumPy array with one slot per event.
+    """
+    cols = {
+        "year": np.array([event["year"] for event in events], dtype=np.int64),
+        "event": np.array([event["event"] for event in events], dtype=object),
+        "date": np.array([event["date"] for event in events], dtype=object)
+    }
+    for column, values in zip(METRIC_COLUMNS, metrics.T):
+        cols[column] = values
+    return cols
 
 # Define a function to analyze market reactions to each tariff event
-def analyze_event(event, symbol):
+def analyze_event(event, market, symbol="SPY"):
     """
     Analyze S&P 500 (SPY) reactions to tariff events, calculating price change, volume change, and RSI.
-    Parameters: event (dict with event details), symbol (stock ticker, e.g., 'SPY').
-    Returns: dict with analysis results for each time period.
+    Parameters: event (dict with event details), market ((dates, close, volume) arrays from to_market_arrays
+    covering all events),
+    symbol (stock ticker used in log messages, e.g., 'SPY').
+    Returns: NumPy array of metrics ordered like METRIC_COLUMNS; metrics that cannot be calculated are NaN.
     """
+    empty_result = np.full(len(METRIC_COLUMNS), np.nan)
     try:
-        # Convert announcement date to datetime for comparison
-        start_date = datetime.strptime(event["date"], "%Y-%m-%d")
-        lookback_start = start_date - timedelta(days=30)  # 30-day lookback for RSI calculation
-        end_date = min(start_date + timedelta(days=365), datetime.now())  # Up to 1 year or current date
+        # Announcement date, parsed once when the events were set up
+        start_date = event["_dt"]
+        lookback_start = start_date - LOOKBACK  # 30-day lookback for RSI calculation
+        end_date = min(start_date + ONE_YEAR, NOW)  # Up to 1 year or current date
         
         # Skip events too recent to have meaningful data (within 30 days of today)
-        if start_date > datetime.now() - timedelta(days=30):
+        if start_date > TOO_RECENT_CUTOFF:
             print(f"Skipping {event['event']} ({event['date']}) as it's too recent")
-            return create_empty_result(event)
+            return empty_result
         
-        # Fetch SPY data for the event period
-        df = fetch_market_data(symbol, lookback_start, end_date)
+        # Locate the event period by position in the sorted dates, then slice the pre-extracted arrays
+        dates, close, volume = market
+        lo = dates.searchsorted(np.datetime64(lookback_start, 'ns'), side='left')
+        hi = dates.searchsorted(np.datetime64(end_date, 'ns'), side='right')
         
-        if df.empty:
+        if lo == hi:
             print(f"No data available for {symbol} for event {event['event']} ({event['date']})")
-            return create_empty_result(event)
-            
-        # Standardize column names to lowercase for consistency
-        df.columns = [col.lower() for col in df.columns]
+            return empty_result
+        
+        dates = dates[lo:hi]
+        close = close[lo:hi]
+        volume = volume[lo:hi]
         
         # Calculate RSI for the dataset
-        df['rsi'] = calculate_rsi(df['close'])
+        rsi = calculate_rsi(close)
         
-        # Find the closest trading day to the announcement date
-        closest_start = df.index[df.index >= start_date][0]
-        start_data = df.loc[closest_start]
-        pre_tariff_price = start_data['close']  # Baseline price on announcement day
-        pre_tariff_volume = start_data['volume']  # Baseline volume on announcement day
+        # Find the closest trading day on or after the announcement and each analysis period
+        # with one binary search over the sorted dates
+        lookup_dates = np.concatenate(([np.datetime64(start_date, 'ns')], event["_period_dts"]))
+        idx = dates.searchsorted(lookup_dates, side='left')
         
-        # Helper function to calculate metrics for a given date
-        def calc_metrics(after_date):
-            """Calculate price change %, volume change %, and RSI for a specific date."""
-            if any(df.index >= after_date):
-                closest_date = df.index[df.index >= after_date][0]
-                after_data = df.loc[closest_date]
-                
-                # Calculate percentage changes relative to announcement day
-                price_change = ((after_data['close'] - pre_tariff_price) / pre_tariff_price) * 100
-                volume_change = ((after_data['volume'] - pre_tariff_volume) / pre_tariff_volume) * 100
-                
-                return {
-                    'price_change_%': price_change,  # % change in price
-                    'volume_change_%': volume_change,  # % change in trading volume
-                    'rsi': after_data['rsi']  # RSI value at that date
-                }
-            return None
-
-        # Calculate metrics for each time period
-        metrics = {}
-        for period in ['one_week_after', 'one_month_after', 'three_months_after', 
-                      'six_months_after', 'end_of_year']:
-            period_date = datetime.strptime(event[period], "%Y-%m-%d")
-            period_metrics = calc_metrics(period_date)
-            if period_metrics:
-                for metric_name, value in period_metrics.items():
-                    metrics[f"{period}_{metric_name}"] = value
-            else:
-                # If no data for the period (e.g., future dates), set to None
-                for metric_name in ['price_change_%', 'volume_change_%', 'rsi']:
-                    metrics[f"{period}_{metric_name}"] = None
-
-        # Return the event details with calculated metrics
-        return {
-            "year": event["year"],
-            "event": event["event"],
-            "date": event["date"],
-            **metrics
-        }
+        if idx[0] == len(dates):
+            print(f"No trading day on or after {event['date']} for {symbol}")
+            return empty_result
+        
+        # Calculate metrics for every period relative to announcement day in one compiled call
+        return _event_kernel(close, volume, rsi, idx[0], idx[1:]).ravel()
         
     except Exception as e:
         print(f"Error analyzing {symbol} for event {event['event']} ({event['date']}): {e}")
-        return create_empty_result(event)
-
-# Define a function to create an empty result for failed or future events
-def create_empty_result(event):
-    """
-    Create a placeholder result with None values for events with no data.
-    Parameters: event (dict with event details).
-    Returns: dict with event info and null metrics.
-    """
-    periods = ['one_week_after', 'one_month_after', 'three_months_after', 
-              'six_months_after', 'end_of_year']
-    metrics = ['price_change_%', 'volume_change_%', 'rsi']
-    
-    result = {
-        "year": event["year"],
-        "event": event["event"],
-        "date": event["date"]
-    }
-    
-    # Set all metrics to None for each period
-    for period in periods:
-        for metric in metrics:
-            result[f"{period}_{metric}"] = None
-            
-    return result
+        return empty_result
+
+# Define a function to bulk-write a DataFrame into SQLite in a single transaction
+def write_sqlite(df, db_path, table):
+    """
+    Replace an SQLite table with the contents of a DataFrame using chunked executemany calls.
+    Durability pragmas are relaxed for the bulk load since the table is fully regenerated each run.
+    Parameters: df (DataFrame to store), db_path (SQLite file), table (destination table name).
+    """
+    # Map pandas dtypes to SQLite column types; everything non-numeric is stored as text
+    def sql_type(dtype):
+        if pd.api.types.is_integer_dtype(dtype):
+            return "INTEGER"
+        if pd.api.types.is_float_dtype(dtype):
+            return "REAL"
+        return "TEXT"
+
+    columns = ", ".join(f'"{col}" {sql_type(dtype)}' for col, dtype in df.dtypes.items())
+    placeholders = ", ".join("?" for _ in df.columns)
+    insert_sql = f'INSERT INTO "{table}" VALUES ({placeholders})'
+
+    with closing(sqlite3.connect(db_path)) as conn:  # Always release the file handle
+        conn.execute("PRAGMA synchronous=OFF")  # Skip fsync during the load
+        conn.execute("PRAGMA journal_mode=MEMORY")  # Keep the rollback journal off disk
+        with conn:  # Single transaction: commits once at the end, rolls back on error
+            # Open the transaction explicitly; otherwise sqlite3 autocommits the DROP/CREATE below
+            # and a failed insert would leave the old table gone and an empty one behind
+            conn.execute("BEGIN")
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'CREATE TABLE "{table}" ({columns})')
+            # Insert in fixed-size chunks so large tables never build one huge parameter list
+            for chunk_start in range(0, len(df), SQLITE_CHUNK_ROWS):
+                chunk = df.iloc[chunk_start:chunk_start + SQLITE_CHUNK_ROWS]
+                conn.executemany(insert_sql, chunk.itertuples(index=False, name=None))
+
+# Define a function to load a DataFrame into DuckDB without row-by-row inserts
+def write_duckdb(df, db_path, table):
+    """
+    Replace a DuckDB table with the contents of a DataFrame in one CREATE TABLE AS statement.
+    DuckDB scans the DataFrame's column buffers directly, so no INSERTs are issued.
+    Parameters: df (DataFrame to store), db_path (DuckDB file), table (destination table name).
+    """
+    import duckdb  # Optional dependency, only needed when DB_BACKEND is "duckdb"
+
+    con = duckdb.connect(db_path)
+    try:
+        con.register("results_df", df)
+        con.execute(f'CREATE OR REPLACE TABLE "{table}" AS SELECT * FROM results_df')
+    finally:
+        con.close()
 
 # Main execution: Analyze S&P 500 data for all tariff events
-print("Fetching and analyzing simplified S&P 500 market data...")
-sp500_data = [analyze_event(event, "SPY") for event in events]  # Process each event with SPY ticker
+def main():
+    """Fetch market data, analyze every tariff event, and save the results."""
+    print("Fetching and analyzing simplified S&P 500 market data...")
+    market_data = fetch_all(["SPY"], events)  # One download per symbol covering every event's window
+    spy = to_market_arrays(market_data["SPY"])  # Extract the analysis columns once, right after fetching
+
+    # Process each event against the shared data; fan out across CPU cores only when there are enough
+    # events to outweigh worker start-up, otherwise joblib runs them sequentially in this process
+    n_jobs = -1 if len(events) >= PARALLEL_MIN_EVENTS else 1
+    results = Parallel(n_jobs=n_jobs, backend='loky')(delayed(analyze_event)(event, spy) for event in events)
+
+    # Build the DataFrame directly from the column arrays
+    sp500_df = pd.DataFrame(build_results(events, np.vstack(results)))
+
+    # Store the results in a database for future querying
+    if DB_BACKEND == "duckdb":
+        db_path = "tariff_analysis.duckdb"
+        write_duckdb(sp500_df, db_path, "sp500")  # Overwrite existing table
+    else:
+        db_path = "tariff_analysis.db"
+        write_sqlite(sp500_df, db_path, "sp500")  # Overwrite existing table
 
-# Convert the list of results into a pandas DataFrame for easy handling
-sp500_df = pd.DataFrame(sp500_data)
+    # Save the results to a CSV file for public sharing and Excel analysis
+    pacsv.write_csv(pa.Table.from_pandas(sp500_df, preserve_index=False), "sp500_analysis.csv",
+                    write_options=pacsv.WriteOptions(quoting_style="needed"))  # Header and text fields are quoted, numbers are not
 
-# Store the results in an SQLite database for future querying
-conn = sqlite3.connect("tariff_analysis.db")
-sp500_df.to_sql("sp500", conn, if_exists="replace", index=False)  # Overwrite existing table
-conn.close()
+    # Save a Parquet copy as well for fast columnar reads in later analysis
+    sp500_df.to_parquet("sp500_analysis.parquet", engine="pyarrow", index=False)
 
-# Save the results to a CSV file for public sharing and Excel analysis
-sp500_df.to_csv("sp500_analysis.csv", index=False)
+    # Display a preview of key columns in the console
+    print("\nS&P 500 Analysis Table (Selected Columns):")
+    print(sp500_df[['year', 'event', 'date', 
+                    'one_week_after_price_change_%', 'one_month_after_price_change_%', 
+                    'three_months_after_price_change_%', 'six_months_after_price_change_%', 
+                    'end_of_year_price_change_%']])
 
-# Display a preview of key columns in the console
-print("\nS&P 500 Analysis Table (Selected Columns):")
-print(sp500_df[['year', 'event', 'date', 
-                'one_week_after_price_change_%', 'one_month_after_price_change_%', 
-                'three_months_after_price_change_%', 'six_months_after_price_change_%', 
-                'end_of_year_price_change_%']])
+    # Confirm completion
+    print(f"\nAnalysis complete. Results saved to 'sp500_analysis.csv', 'sp500_analysis.parquet' and database '{db_path}'.")
 
-# Confirm completion
-print("\nAnalysis complete. Results saved to 'sp500_analysis.csv' and SQLite database 'tariff_analysis.db'.")
+# Only run the analysis when executed as a script, so worker processes can import this module safely
+if __name__ == "__main__":
+    main()